@@ -1,18 +1,33 @@
 import asyncio
+import atexit
 import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
 import uvicorn
 
 from watson.config import config
 
 
-try:
+if sys.platform != "win32":
     import uvloop
-    
+
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-except ImportError:
-    pass
 
-logging.basicConfig(level=logging.DEBUG if config.environment == "development" else logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+# Log records are handed to a background thread so writing them never blocks the event loop
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Only merge the arguments into the message here; the listener's handler does the full formatting
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+logging.basicConfig(level=logging.DEBUG if config.environment == "development" else logging.INFO, handlers=[_queue_handler])
 
 
 def start():
@@ -20,8 +35,13 @@ def start():
         "watson.fastapi:app",
         host="0.0.0.0",
         port=config.port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info" if config.environment == "development" else "warning",
-        reload=config.environment == "development"
+        access_log=config.environment == "development",
+        reload=config.environment == "development",
+        # One process per core in production; reload mode only supports a single worker
+        workers=None if config.environment == "development" else config.web_concurrency or os.cpu_count() or 1
     )
     
 
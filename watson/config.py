@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 
@@ -12,6 +14,7 @@ class Config(BaseSettings):
     slack: SlackConfig
     environment: str = "development"
     port: int = 3000
+    web_concurrency: Optional[int] = None
     secret_key: str
 
 
@@ -1,109 +1,318 @@
+import asyncio
 import logging
-import json
+from collections import deque
 import httpx
-from typing import Any, Dict, Optional
+import msgspec
+import orjson
+from typing import Deque, Dict, List, Mapping, Optional
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
 
 from watson.config import config
 
-app = FastAPI()
+app = FastAPI(title="Watson", description="Returns 200 to all requests and forwards data to Slack", default_response_class=ORJSONResponse)
 
+logger = logging.getLogger(__name__)
 
+_client: Optional[httpx.AsyncClient] = None
 
-app = FastAPI(title="Watson", description="Returns 200 to all requests and forwards data to Slack")
+# Formatted requests waiting to be posted, per channel, and when each
+# rate-limited channel may be posted to again (event loop time)
+_pending: Dict[str, Deque[str]] = {}
+_retry_at: Dict[str, float] = {}
 
-logger = logging.getLogger(__name__)
+SLACK_BOT_TOKEN = config.slack.bot_token
+SLACK_CHANNEL_ID = config.slack.channel_id
+SECRET_KEY = config.secret_key
+
+SLACK_URL = "https://slack.com/api/chat.postMessage"
+
+_AUTH_HEADERS = {
+    "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
+    "Content-Type": "application/json"
+}
+
+_MSG_TEMPLATE = """
+🔔 *Watson Request*
+• Method: `{}`
+• Path: `{}`
+• Message: ```{}```
+• Headers: ```{}```
+""".strip()
+
+MAX_BODY_SIZE = 35000
+
+# Pre-serialized body for the static {"status": "ok"} responses
+_OK_BYTES = orjson.dumps({"status": "ok"})
 
+# Requests handled by their own routes and never forwarded to Slack; every
+# other request (including other methods on these paths) is answered
+# directly by the middleware
+_SKIP_ROUTES = frozenset({
+    ("GET", "/"),
+    ("HEAD", "/"),
+    ("GET", "/health"),
+    ("HEAD", "/health"),
+    ("POST", "/slack/test"),
+})
 
-class SlackMessage(BaseModel):
+# Methods that don't carry a body, so there's nothing to read
+_NO_BODY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+SLACK_QUEUE_SIZE = 10000
+SLACK_FLUSH_INTERVAL = 1.0
+# How long shutdown waits for the final flush before dropping what's left
+SLACK_SHUTDOWN_TIMEOUT = 5.0
+# Slack truncates message text beyond this many characters
+SLACK_TEXT_LIMIT = 40000
+_BATCH_SEPARATOR = "\n---\n"
+
+
+class SlackMessage(msgspec.Struct):
     text: str
-    channel: Optional[str] = None
     key: str
+    channel: Optional[str] = None
+
+
+@app.on_event("startup")
+async def startup():
+    """Create the shared Slack client so connections are reused across requests"""
+    global _client
+    _client = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=10.0,
+        http2=True,
+        headers=_AUTH_HEADERS
+    )
+    _pending.clear()
+    _retry_at.clear()
+    app.state.slack_queue = asyncio.Queue(maxsize=SLACK_QUEUE_SIZE)
+    app.state.slack_stop = asyncio.Event()
+    app.state.slack_flusher = asyncio.create_task(slack_flusher(app.state.slack_queue, app.state.slack_stop))
+    app.state.slack_flusher.add_done_callback(_flusher_done)
 
 
-async def send_to_slack(message: str, method: str, path: str, headers: Dict[str, Any], channel_id: Optional[str] = None):
-    """Send a message to Slack using webhook or bot token"""
+def _flusher_done(task: asyncio.Task):
+    """Log the Slack flusher dying, which otherwise only shows as a full queue"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Slack flusher stopped unexpectedly", exc_info=task.exception())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush what's left in the Slack queue, then close the shared Slack client"""
+    app.state.slack_stop.set()
+    try:
+        await asyncio.wait_for(app.state.slack_flusher, SLACK_SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("Timed out flushing to Slack on shutdown")
+    except Exception:
+        # Already logged by _flusher_done
+        pass
+    finally:
+        unsent = app.state.slack_queue.qsize() + _pending_count()
+        if unsent:
+            logger.warning("Dropping %d request(s) that were never sent to Slack", unsent)
+        if _client is not None:
+            await _client.aclose()
+
+
+def format_message(message: str, method: str, path: str, headers: Mapping[str, str]) -> str:
+    """Render a request as a Slack message"""
 
     # format message as json if it is json
     if isinstance(message, dict):
-        message = json.dumps(message, indent=2)
-    formatted_message = f"""
-🔔 *Watson Request*
-• Method: `{method}`
-• Path: `{path}`
-• Message: ```{message}```
-• Headers: ```{json.dumps(dict(headers), indent=2)}```
-    """.strip()
+        message = orjson.dumps(message, option=orjson.OPT_INDENT_2).decode()
+    headers_json = orjson.dumps(dict(headers), option=orjson.OPT_INDENT_2).decode()
+    return _MSG_TEMPLATE.format(method, path, message, headers_json)
 
+
+async def _post_message(text: str, channel_id: Optional[str] = None):
+    """Post already formatted text to Slack, returning (ok, error, retry_after)"""
     try:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "channel": channel_id or config.slack.channel_id,
-                "text": formatted_message,
-                "parse": "mrkdwn"
-            }
-            response = await client.post(
-                "https://slack.com/api/chat.postMessage",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {config.slack.bot_token}",
-                    "Content-Type": "application/json"
-                }
-            )
-            result = response.json()
-            if not result.get("ok"):
-                error = result.get('error')
-                logger.warning(f"Slack API error: {error}")
-                return False, error
-            else:
-                logger.info("Message sent to Slack successfully")
-                return True, None
+        body_bytes = orjson.dumps({
+            "channel": channel_id or SLACK_CHANNEL_ID,
+            "text": text,
+            "parse": "mrkdwn"
+        })
+        response = await _client.post(SLACK_URL, content=body_bytes)
+        if response.status_code == 429:
+            retry_after = float(response.headers.get("Retry-After", SLACK_FLUSH_INTERVAL))
+            logger.warning("Slack API error: ratelimited (retry after %ss)", retry_after)
+            return False, "ratelimited", retry_after
+        result = orjson.loads(response.content)
+        if not result.get("ok"):
+            error = result.get('error')
+            logger.warning("Slack API error: %s", error)
+            return False, error, None
+        else:
+            logger.info("Message sent to Slack successfully")
+            return True, None, None
 
     except Exception as e:
         error_msg = str(e)
-        logger.warning(f"Error sending to Slack: {error_msg}")
-        return False, error_msg
+        logger.warning("Error sending to Slack: %s", error_msg)
+        return False, error_msg, None
+
+
+async def post_to_slack(text: str, channel_id: Optional[str] = None):
+    """Post already formatted text to Slack using the bot token"""
+    res, error, _ = await _post_message(text, channel_id)
+    return res, error
+
+
+async def send_to_slack(message: str, method: str, path: str, headers: Mapping[str, str], channel_id: Optional[str] = None):
+    """Send a single request to Slack"""
+    return await post_to_slack(format_message(message, method, path, headers), channel_id)
+
+
+def _pending_count() -> int:
+    return sum(len(messages) for messages in _pending.values())
+
+
+def _take_chunk(messages: Deque[str]) -> List[str]:
+    """Pop as many messages off the front as fit in one Slack message"""
+    chunk = [messages.popleft()]
+    size = len(chunk[0])
+    while messages and size + len(_BATCH_SEPARATOR) + len(messages[0]) <= SLACK_TEXT_LIMIT:
+        text = messages.popleft()
+        size += len(_BATCH_SEPARATOR) + len(text)
+        chunk.append(text)
+    return chunk
+
+
+async def post_chunk(channel_id: str):
+    """Post the next Slack message's worth of pending requests to a channel"""
+    _retry_at.pop(channel_id, None)
+    messages = _pending[channel_id]
+    chunk = _take_chunk(messages)
+    try:
+        res, error, retry_after = await _post_message(_BATCH_SEPARATOR.join(chunk), channel_id)
+    except asyncio.CancelledError:
+        # Put the chunk back so shutdown can count it
+        messages.extendleft(reversed(chunk))
+        raise
+    if error == "ratelimited":
+        # Keep the chunk at the front and leave the channel alone until Slack allows it again
+        messages.extendleft(reversed(chunk))
+        _retry_at[channel_id] = asyncio.get_running_loop().time() + retry_after
+    elif not res:
+        logger.warning("Failed to send %d request(s) to Slack channel %s: %s", len(chunk), channel_id, error)
+    if not messages:
+        del _pending[channel_id]
+
+
+def _drain_queue(queue: asyncio.Queue):
+    """Move queued requests into the per-channel pending messages"""
+    count = _pending_count()
+    # Stop draining once the pending backlog is full, so the queue applies backpressure
+    while count < SLACK_QUEUE_SIZE and not queue.empty():
+        message, method, path, headers, channel_id = queue.get_nowait()
+        _pending.setdefault(channel_id or SLACK_CHANNEL_ID, deque()).append(
+            format_message(message, method, path, headers)
+        )
+        count += 1
+
+
+async def flush_queue(queue: asyncio.Queue):
+    """Post one Slack message to every channel with pending requests
+
+    Slack allows roughly one chat.postMessage per second per channel, so each
+    flush sends at most one message per channel and leaves the rest pending.
+    At the default interval this caps forwarding at about one message (up to
+    SLACK_TEXT_LIMIT characters of requests) per channel per second.
+    """
+    _drain_queue(queue)
+
+    now = asyncio.get_running_loop().time()
+    channels = [channel_id for channel_id in _pending if _retry_at.get(channel_id, 0) <= now]
+
+    # Post every channel concurrently; if the flusher is cancelled (shutdown
+    # timed out) the posts still in flight are put back as pending
+    results = await asyncio.gather(
+        *(post_chunk(channel_id) for channel_id in channels),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Failed to send to Slack: %s", result)
+
+
+async def slack_flusher(queue: asyncio.Queue, stop: asyncio.Event):
+    """Forward queued requests to Slack in batches, once per flush interval
+
+    Once ``stop`` is set, keep flushing until nothing is queued or pending and
+    then return; shutdown bounds how long this may take.
+    """
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), SLACK_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        await flush_queue(queue)
+
+    # Requests may have been queued while the last flush was posting
+    await flush_queue(queue)
+    while _pending or not queue.empty():
+        await asyncio.sleep(SLACK_FLUSH_INTERVAL)
+        await flush_queue(queue)
+
+
+async def read_body(request: Request) -> str:
+    """Read the request body as text, truncated to MAX_BODY_SIZE bytes"""
+    try:
+        # Stream the body and stop reading once it's over the Slack limit
+        body = bytearray()
+        truncated = False
+        async for chunk in request.stream():
+            body.extend(chunk)
+            if len(body) > MAX_BODY_SIZE:
+                del body[MAX_BODY_SIZE:]
+                truncated = True
+                break
+        if not body:
+            return "[empty body]"
+        # Invalid bytes (binary data or a character cut by truncation) become U+FFFD
+        body_text = body.decode("utf-8", errors="replace")
+        if truncated:
+            body_text += "... [truncated]"
+        return body_text
+    except:
+        return "[could not read body]"
 
 
 @app.middleware("http")
 async def catch_all_middleware(request: Request, call_next):
-    """Middleware to catch all requests and send to Slack"""
+    """Middleware to catch all requests and queue them for Slack"""
 
-    # Get request details
     method = request.method
-    path = str(request.url.path)
-    headers = dict(request.headers)
+    path = request.url.path
+    if (method, path) in _SKIP_ROUTES:
+        return await call_next(request)
+
+    # Get request details
+    headers = request.headers
 
     # Check for slack_id query parameter
     slack_channel_id = request.query_params.get("channel_id")
 
     # Try to get request body for logging
-    try:
-        body = await request.body()
-        if body:
-            try:
-                body_text = body.decode('utf-8')
-                if len(body_text) > 35000:  # Truncate long bodies
-                    body_text = body_text[:35000] + "... [truncated]"
-            except:
-                body_text = "[binary data]"
-        else:
-            body_text = "[empty body]"
-    except:
-        body_text = "[could not read body]"
+    if method in _NO_BODY_METHODS:
+        body_text = "[empty body]"
+    else:
+        body_text = await read_body(request)
 
+    # Hand off to the Slack flusher so the response doesn't wait on Slack
     try:
-        res, error = await send_to_slack(body_text, method, path, headers, slack_channel_id)
-    except Exception as e:
-        res = False
-        error = str(e)
-        logger.warning(f"Failed to send to Slack: {e}")
+        request.app.state.slack_queue.put_nowait((body_text, method, path, headers, slack_channel_id))
+        queued = True
+    except asyncio.QueueFull:
+        queued = False
+        logger.warning("Slack queue is full, dropping %s %s", method, path)
 
     # Prepare response content with channel info
     response_content = {
-        "status": "ok" if res else "warning",
+        "status": "ok" if queued else "warning",
         "method": method,
         "path": path
     }
@@ -111,54 +320,43 @@ async def catch_all_middleware(request: Request, call_next):
     if slack_channel_id:
         response_content["slack_channel_override"] = slack_channel_id
 
-    if res:
-        response_content["message"] = "Request processed successfully and sent to Slack"
+    if queued:
+        response_content["message"] = "Request processed successfully and queued for Slack"
         if slack_channel_id:
             response_content["message"] += f" (custom channel: {slack_channel_id})"
     else:
-        # Handle specific Slack API errors
-        if error == "channel_not_found":
-            channel = slack_channel_id or config.slack.channel_id
-            response_content["message"] = f"Request processed, but Slack channel not found: {channel}"
-        elif error == "not_in_channel":
-            channel = slack_channel_id or config.slack.channel_id
-            response_content["message"] = f"Request processed, but bot is not in Slack channel: {channel}"
-        elif error == "channel_is_archived":
-            channel = slack_channel_id or config.slack.channel_id
-            response_content["message"] = f"Request processed, but Slack channel is archived: {channel}"
-        elif error and "channel" in error.lower():
-            channel = slack_channel_id or config.slack.channel_id
-            response_content["message"] = f"Request processed, but Slack channel error ({error}): {channel}"
-        else:
-            response_content["message"] = "Request processed, but failed to send to Slack"
-            if slack_channel_id:
-                response_content["message"] += f" (attempted custom channel: {slack_channel_id})"
-            if error:
-                response_content["slack_error"] = error
+        response_content["message"] = "Request processed, but Slack queue is full"
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=200,
         content=response_content
     )
 
 
-@app.get("/")
+@app.api_route("/", methods=["GET", "HEAD"])
 async def root():
-    """Root endpoint - handled by middleware but documented here"""
-    pass
+    """Root endpoint - not forwarded to Slack"""
+    return Response(content=_OK_BYTES, media_type="application/json")
 
 
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
-    """Health check endpoint"""
-    pass
+    """Health check endpoint - not forwarded to Slack"""
+    return Response(content=_OK_BYTES, media_type="application/json")
 
 
 @app.post("/slack/test")
-async def test_slack(message: SlackMessage):
+async def test_slack(request: Request):
     """Test endpoint to manually send a message to Slack"""
-    if message.key != config.secret_key:
-        return JSONResponse(
+    try:
+        message = msgspec.json.decode(await request.body(), type=SlackMessage)
+    except msgspec.DecodeError as e:
+        return ORJSONResponse(
+            status_code=422,
+            content={"error": str(e)}
+        )
+    if message.key != SECRET_KEY:
+        return ORJSONResponse(
             status_code=401,
             content={"error": "Invalid key"}
         )
@@ -170,9 +368,3 @@ async def test_slack(message: SlackMessage):
     )
     return {"status": "Message sent to Slack"}
 
-
-# Catch-all route for any other endpoints
-@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"])
-async def catch_all(path: str, request: Request):
-    """Catch-all route - handled by middleware"""
-    pass